@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Script to add user-emails entries for users created before that table existed.
+Run it once against an existing deployment; re-running it is safe.
+"""
+
+import asyncio
+import os
+import re
+from botocore.exceptions import ClientError
+
+# KEY=value assignments; comments and blank lines never match
+_ENV_LINE_RE = re.compile(r'^\s*([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*?)\s*$')
+
+# Load environment variables (variables already exported take precedence)
+if os.path.exists('.env.local'):
+    with open('.env.local') as f:
+        for line in f:
+            match = _ENV_LINE_RE.match(line)
+            if match:
+                os.environ.setdefault(match.group(1), match.group(2))
+
+from services import dynamodb  # noqa: E402 - reads TABLE_PREFIX at import
+
+def backfill_user_emails():
+    """Claim each existing user's email; returns (added, emails already claimed by another user)."""
+    emails_table = dynamodb.get_dynamodb_resource().Table(dynamodb.USER_EMAILS_TABLE_NAME)
+    added, conflicts = 0, []
+    for user in asyncio.run(dynamodb.list_users()):
+        try:
+            emails_table.put_item(
+                Item={'email': user['email'], 'user_id': user['user_id']},
+                ConditionExpression='attribute_not_exists(email) OR user_id = :user_id',
+                ExpressionAttributeValues={':user_id': user['user_id']}
+            )
+            added += 1
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            conflicts.append(user['email'])
+    return added, conflicts
+
+if __name__ == '__main__':
+    print(f"Backfilling {dynamodb.USER_EMAILS_TABLE_NAME} from {dynamodb.USERS_TABLE_NAME}")
+    added, conflicts = backfill_user_emails()
+    print(f"✅ {added} email entries written")
+    for email in conflicts:
+        print(f"⚠️  {email} is registered to more than one user; resolve by hand")
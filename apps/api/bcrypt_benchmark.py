@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Script to time bcrypt at several work factors on this machine.
+Pick the largest BCRYPT_ROUNDS that keeps a hash around 150-250 ms.
+"""
+
+import time
+import bcrypt
+
+SAMPLES = 3
+
+def time_hash(rounds: int) -> float:
+    """Average milliseconds for one bcrypt hash at the given work factor."""
+    salt = bcrypt.gensalt(rounds=rounds)
+    start = time.perf_counter()
+    for _ in range(SAMPLES):
+        bcrypt.hashpw(b'benchmark-password', salt)
+    return (time.perf_counter() - start) / SAMPLES * 1000
+
+if __name__ == '__main__':
+    for rounds in range(10, 15):
+        print(f"BCRYPT_ROUNDS={rounds}: {time_hash(rounds):.0f} ms")
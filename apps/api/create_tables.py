@@ -5,17 +5,21 @@ Run this once to set up your local DynamoDB tables.
 """
 
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import boto3
 from botocore.exceptions import ClientError
 
-# Load environment variables
+# KEY=value assignments; comments and blank lines never match
+_ENV_LINE_RE = re.compile(r'^\s*([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*?)\s*$')
+
+# Load environment variables (variables already exported take precedence)
 if os.path.exists('.env.local'):
     with open('.env.local') as f:
         for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                key, value = line.split('=', 1)
-                os.environ[key.strip()] = value.strip()
+            match = _ENV_LINE_RE.match(line)
+            if match:
+                os.environ.setdefault(match.group(1), match.group(2))
 
 # Get configuration
 table_prefix = os.getenv('TABLE_PREFIX')
@@ -27,102 +31,105 @@ if not table_prefix:
 region = os.getenv('AWS_REGION', 'us-east-1')
 profile = os.getenv('AWS_PROFILE')
 
-# Create DynamoDB client
+# Create DynamoDB client (clients are thread-safe, unlike resources, so the
+# worker threads below can share it)
 if profile:
     session = boto3.Session(profile_name=profile, region_name=region)
-    dynamodb = session.client('dynamodb')
+    dynamodb_client = session.client('dynamodb')
 else:
-    dynamodb = boto3.client('dynamodb', region_name=region)
+    dynamodb_client = boto3.client('dynamodb', region_name=region)
 
-def create_users_table():
-    """Create the users table with email-index GSI."""
+def users_table_definition():
+    """Return the create_table arguments for the users table with email-index GSI (see template.yaml)."""
     table_name = f"{table_prefix}-users"
     
-    try:
-        response = dynamodb.create_table(
-            TableName=table_name,
-            AttributeDefinitions=[
-                {'AttributeName': 'user_id', 'AttributeType': 'S'},
-                {'AttributeName': 'email', 'AttributeType': 'S'}
-            ],
-            KeySchema=[
-                {'AttributeName': 'user_id', 'KeyType': 'HASH'}
-            ],
-            GlobalSecondaryIndexes=[
-                {
-                    'IndexName': 'email-index',
-                    'KeySchema': [
-                        {'AttributeName': 'email', 'KeyType': 'HASH'}
-                    ],
-                    'Projection': {
-                        'ProjectionType': 'ALL'
-                    }
+    return table_name, dict(
+        TableName=table_name,
+        AttributeDefinitions=[
+            {'AttributeName': 'user_id', 'AttributeType': 'S'},
+            {'AttributeName': 'email', 'AttributeType': 'S'}
+        ],
+        KeySchema=[
+            {'AttributeName': 'user_id', 'KeyType': 'HASH'}
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                'IndexName': 'email-index',
+                'KeySchema': [
+                    {'AttributeName': 'email', 'KeyType': 'HASH'}
+                ],
+                'Projection': {
+                    'ProjectionType': 'ALL'
                 }
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        print(f"✅ Created table: {table_name}")
-        return response
-    except ClientError as e:
-        if e.response['Error']['Code'] == 'ResourceInUseException':
-            print(f"⚠️  Table {table_name} already exists")
-        else:
-            print(f"❌ Error creating {table_name}: {e}")
-            raise
+            }
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+
+def user_emails_table_definition():
+    """Return the create_table arguments for the user-emails table (one item per registered email)."""
+    table_name = f"{table_prefix}-user-emails"
+    
+    return table_name, dict(
+        TableName=table_name,
+        AttributeDefinitions=[
+            {'AttributeName': 'email', 'AttributeType': 'S'}
+        ],
+        KeySchema=[
+            {'AttributeName': 'email', 'KeyType': 'HASH'}
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
 
-def create_tags_table():
-    """Create the tags table."""
+def tags_table_definition():
+    """Return the create_table arguments for the tags table."""
     table_name = f"{table_prefix}-tags"
     
-    try:
-        response = dynamodb.create_table(
-            TableName=table_name,
-            AttributeDefinitions=[
-                {'AttributeName': 'tag_id', 'AttributeType': 'S'}
-            ],
-            KeySchema=[
-                {'AttributeName': 'tag_id', 'KeyType': 'HASH'}
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        print(f"✅ Created table: {table_name}")
-        return response
-    except ClientError as e:
-        if e.response['Error']['Code'] == 'ResourceInUseException':
-            print(f"⚠️  Table {table_name} already exists")
-        else:
-            print(f"❌ Error creating {table_name}: {e}")
-            raise
+    return table_name, dict(
+        TableName=table_name,
+        AttributeDefinitions=[
+            {'AttributeName': 'tag_id', 'AttributeType': 'S'}
+        ],
+        KeySchema=[
+            {'AttributeName': 'tag_id', 'KeyType': 'HASH'}
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
 
-def create_resources_table():
-    """Create the resources table with user_id-index GSI."""
+def resources_table_definition():
+    """Return the create_table arguments for the resources table with user_id-created_at-index GSI."""
     table_name = f"{table_prefix}-resources"
     
-    try:
-        response = dynamodb.create_table(
-            TableName=table_name,
-            AttributeDefinitions=[
-                {'AttributeName': 'resource_id', 'AttributeType': 'S'},
-                {'AttributeName': 'user_id', 'AttributeType': 'S'}
-            ],
-            KeySchema=[
-                {'AttributeName': 'resource_id', 'KeyType': 'HASH'}
-            ],
-            GlobalSecondaryIndexes=[
-                {
-                    'IndexName': 'user_id-index',
-                    'KeySchema': [
-                        {'AttributeName': 'user_id', 'KeyType': 'HASH'}
-                    ],
-                    'Projection': {
-                        'ProjectionType': 'ALL'
-                    }
+    return table_name, dict(
+        TableName=table_name,
+        AttributeDefinitions=[
+            {'AttributeName': 'resource_id', 'AttributeType': 'S'},
+            {'AttributeName': 'user_id', 'AttributeType': 'S'},
+            {'AttributeName': 'created_at', 'AttributeType': 'S'}
+        ],
+        KeySchema=[
+            {'AttributeName': 'resource_id', 'KeyType': 'HASH'}
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                'IndexName': 'user_id-created_at-index',
+                'KeySchema': [
+                    {'AttributeName': 'user_id', 'KeyType': 'HASH'},
+                    {'AttributeName': 'created_at', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {
+                    'ProjectionType': 'ALL'
                 }
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
+            }
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+
+def create_table(table_name, create_kwargs):
+    """Create a single table, treating an existing table as success."""
+    try:
+        dynamodb_client.create_table(**create_kwargs)
         print(f"✅ Created table: {table_name}")
-        return response
     except ClientError as e:
         if e.response['Error']['Code'] == 'ResourceInUseException':
             print(f"⚠️  Table {table_name} already exists")
@@ -130,6 +137,31 @@ def create_resources_table():
             print(f"❌ Error creating {table_name}: {e}")
             raise
 
+def wait_for_table(table_name):
+    """Block until the table is ACTIVE."""
+    dynamodb_client.get_waiter('table_exists').wait(TableName=table_name)
+    print(f"✅ Table is active: {table_name}")
+
+def create_all_tables():
+    """Create all tables concurrently, then wait for them to become active in parallel."""
+    definitions = [
+        users_table_definition(),
+        user_emails_table_definition(),
+        tags_table_definition(),
+        resources_table_definition(),
+    ]
+    
+    # The create_table calls (and their waiters) are independent, so
+    # overlap them instead of running back to back
+    with ThreadPoolExecutor(max_workers=len(definitions)) as executor:
+        futures = [executor.submit(create_table, name, kwargs) for name, kwargs in definitions]
+        for future in as_completed(futures):
+            future.result()
+        
+        futures = [executor.submit(wait_for_table, name) for name, _ in definitions]
+        for future in as_completed(futures):
+            future.result()
+
 if __name__ == '__main__':
     print(f"Creating DynamoDB tables with prefix: {table_prefix}")
     print(f"Region: {region}")
@@ -137,12 +169,9 @@ if __name__ == '__main__':
     print()
     
     try:
-        create_users_table()
-        create_tags_table()
-        create_resources_table()
+        create_all_tables()
         print()
         print("✅ All tables created successfully!")
     except Exception as e:
         print(f"\n❌ Failed to create tables: {e}")
         exit(1)
-
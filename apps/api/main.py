@@ -1,27 +1,46 @@
 import os
+from functools import cache
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from mangum import Mangum
 from routers import tags, resources, users
+from services import dynamodb
 
-app = FastAPI()
+DEFAULT_CORS_ORIGINS = "http://localhost:5173,http://localhost:4173,http://127.0.0.1:5173,http://127.0.0.1:4173"
 
-# Configure CORS from environment variable
-cors_origins_str = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:4173,http://127.0.0.1:5173,http://127.0.0.1:4173")
-cors_origins = [origin.strip() for origin in cors_origins_str.split(",") if origin.strip()]
+@cache
+def cors_origins() -> tuple[str, ...]:
+	"""Parse CORS_ORIGINS once per interpreter."""
+	origins = (origin.strip() for origin in os.getenv("CORS_ORIGINS", DEFAULT_CORS_ORIGINS).split(","))
+	return tuple(origin for origin in origins if origin)
 
-app.add_middleware(
-	CORSMiddleware,
-	allow_origins=cors_origins,
-	allow_credentials=True,
-	allow_methods=["*"],
-	allow_headers=["*"],
-)
+@cache
+def create_app() -> FastAPI:
+	"""Build and wire the FastAPI app; cached so route registration runs once per container."""
+	app = FastAPI(default_response_class=ORJSONResponse)
+	
+	# Configure CORS from environment variable
+	app.add_middleware(
+		CORSMiddleware,
+		allow_origins=list(cors_origins()),
+		allow_credentials=True,
+		allow_methods=["*"],
+		allow_headers=["*"],
+	)
+	
+	# Include routers
+	app.include_router(tags.router)
+	app.include_router(resources.router)
+	app.include_router(users.router)
+	
+	return app
 
-# Include routers
-app.include_router(tags.router)
-app.include_router(resources.router)
-app.include_router(users.router)
+app = create_app()
+
+# Connect to DynamoDB during Lambda init rather than in the first request
+if dynamodb.IS_LAMBDA:
+	dynamodb.warm_up()
 
 # Lambda handler
 handler = Mangum(app, lifespan="off")
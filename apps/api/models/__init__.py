@@ -16,22 +16,7 @@ from .resource import (
     Resource,
     ResourceCollection,
 )
-from .user import UserModel, User, UserCollection, UserResponse
-
-# Rebuild models to resolve forward references
-ResourceBase.model_rebuild()
-ResourceBaseInput.model_rebuild()
-ArticleResource.model_rebuild()
-ArticleResourceInput.model_rebuild()
-CodeSnippetResource.model_rebuild()
-CodeSnippetResourceInput.model_rebuild()
-LearningResourceBase.model_rebuild()
-BookResource.model_rebuild()
-BookResourceInput.model_rebuild()
-CourseResource.model_rebuild()
-CourseResourceInput.model_rebuild()
-ResourceCollection.model_rebuild()
-Resource.model_rebuild()
+from .user import UserModel, UserUpdateModel, User, UserCollection, UserResponse
 
 __all__ = [
     "TagModel",
@@ -47,6 +32,7 @@ __all__ = [
     "Resource",
     "ResourceCollection",
     "UserModel",
+    "UserUpdateModel",
     "User",
     "UserCollection",
     "UserResponse",
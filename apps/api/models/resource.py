@@ -1,17 +1,17 @@
-from typing import Optional, Union, Literal, TYPE_CHECKING, Annotated
+from typing import Optional, Union, Literal, Annotated
 from datetime import datetime
-from pydantic import BaseModel, Field
-
-if TYPE_CHECKING:
-    from models.user import UserResponse
-    from models.tag import TagModel
+from pydantic import BaseModel, Field, field_validator, model_validator
+from models.user import UserResponse
+from models.tag import TagModel, Tag
 
 class ResourceBase(BaseModel):
+    # No per-instance __weakref__ slot; fields already live in pydantic's storage
+    __slots__ = ()
     id: Optional[str] = Field(default=None)
     title: str
     description: str
-    user: "UserResponse"
-    tags: list["TagModel"] = Field(default_factory=list)
+    user: UserResponse
+    tags: list[TagModel] = Field(default_factory=list)
     created_at: Optional[datetime] = None
     
     model_config = {
@@ -30,21 +30,26 @@ class ResourceBaseInput(BaseModel):
     }
 
 class ArticleResource(ResourceBase):
+    __slots__ = ()
     type: Literal["article"] = "article"
     url: str
 
 class CodeSnippetResource(ResourceBase):
+    __slots__ = ()
     type: Literal["code_snippet"] = "code_snippet"
     code: str
 
 class LearningResourceBase(ResourceBase):
+    __slots__ = ()
     author: Optional[str] = None
 
 class BookResource(LearningResourceBase):
+    __slots__ = ()
     type: Literal["book"] = "book"
     author: Optional[str] = None
 
 class CourseResource(LearningResourceBase):
+    __slots__ = ()
     type: Literal["course"] = "course"
     author: Optional[str] = None
 
@@ -76,65 +81,54 @@ ResourceModelInput = Annotated[
 
 class Resource(BaseModel):
     """Resource model for DynamoDB"""
+    __slots__ = ()
     resource_id: str
     title: str
     description: str
     type: str
     user_id: str
     tag_ids: list[str] = Field(default_factory=list)
+    tags: list[Tag] = Field(default_factory=list)  # Denormalized copies of the tagged items
     url: Optional[str] = None
     code: Optional[str] = None
     author: Optional[str] = None
     created_at: Optional[datetime] = None
+    # Alias for resource_id for compatibility; a plain attribute rather than a
+    # property, and never written back to DynamoDB
+    id: str = Field(default="", exclude=True, repr=False)
+    
+    @model_validator(mode='after')
+    def _set_id(self) -> "Resource":
+        self.id = self.resource_id
+        return self
+    
+    @field_validator('created_at', mode='before')
+    @classmethod
+    def _parse_created_at(cls, value):
+        """Parse stored ISO timestamps, treating malformed values as missing."""
+        if isinstance(value, str):
+            try:
+                # Python 3.11+ accepts a trailing 'Z' natively
+                return datetime.fromisoformat(value)
+            except ValueError:
+                return None
+        return value
     
     @classmethod
     def from_dynamodb_item(cls, item: dict) -> "Resource":
         """Create Resource from DynamoDB item."""
-        created_at = None
-        if 'created_at' in item:
-            try:
-                created_at = datetime.fromisoformat(item['created_at'].replace('Z', '+00:00'))
-            except (ValueError, AttributeError):
-                pass
-        
-        return cls(
-            resource_id=item.get('resource_id', ''),
-            title=item.get('title', ''),
-            description=item.get('description', ''),
-            type=item.get('type', ''),
-            user_id=item.get('user_id', ''),
-            tag_ids=item.get('tag_ids', []),
-            url=item.get('url'),
-            code=item.get('code'),
-            author=item.get('author'),
-            created_at=created_at
-        )
+        return cls.model_validate(item)
     
     def to_dynamodb_item(self) -> dict:
         """Convert Resource to DynamoDB item."""
-        item = {
-            'resource_id': self.resource_id,
-            'title': self.title,
-            'description': self.description,
-            'type': self.type,
-            'user_id': self.user_id,
-            'tag_ids': self.tag_ids,
-        }
-        if self.url is not None:
-            item['url'] = self.url
-        if self.code is not None:
-            item['code'] = self.code
-        if self.author is not None:
-            item['author'] = self.author
-        if self.created_at:
-            item['created_at'] = self.created_at.isoformat()
-        return item
-    
-    @property
-    def id(self) -> str:
-        """Alias for resource_id for compatibility."""
-        return self.resource_id
+        # JSON mode renders created_at as an ISO string; unset optional fields are omitted
+        return self.model_dump(exclude_none=True, mode="json")
 
 class ResourceCollection(BaseModel):
     resources: list[ResourceModel]
+    # Set on paginated listings when more resources follow; pass back as ?cursor=
+    next_cursor: Optional[str] = None
+
+class ResourceBatchCreated(BaseModel):
+    created_ids: list[str]
 
@@ -1,8 +1,9 @@
 from typing import Optional
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 
 class TagModel(BaseModel):
     """Pydantic model for tag creation/updates"""
+    __slots__ = ()
     id: Optional[str] = Field(default=None)
     name: str
     
@@ -13,8 +14,16 @@ class TagModel(BaseModel):
 
 class Tag(BaseModel):
     """Tag model for DynamoDB"""
+    __slots__ = ()
     tag_id: str
     name: str
+    # Alias for tag_id for compatibility; a plain attribute rather than a property
+    id: str = Field(default="", exclude=True, repr=False)
+    
+    @model_validator(mode='after')
+    def _set_id(self) -> "Tag":
+        self.id = self.tag_id
+        return self
     
     @classmethod
     def from_dynamodb_item(cls, item: dict) -> "Tag":
@@ -30,11 +39,8 @@ class Tag(BaseModel):
             'tag_id': self.tag_id,
             'name': self.name
         }
-    
-    @property
-    def id(self) -> str:
-        """Alias for tag_id for compatibility."""
-        return self.tag_id
 
 class TagCollection(BaseModel):
     tags: list[TagModel]
+    # Set on paginated listings when more tags follow; pass back as ?cursor=
+    next_cursor: Optional[str] = None
@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import BaseModel, EmailStr, ConfigDict, Field, model_validator
 
 class UserModel(BaseModel):
     """Pydantic model for user creation/updates"""
@@ -8,13 +8,28 @@ class UserModel(BaseModel):
     email: EmailStr
     password: str  # Note: In production, this should be hashed
 
+class UserUpdateModel(BaseModel):
+    """Pydantic model for profile updates; leave password out (or empty) to keep the current one"""
+    first_name: str
+    last_name: str
+    email: EmailStr
+    password: Optional[str] = None
+
 class User(BaseModel):
     """User model for DynamoDB"""
+    __slots__ = ()
     user_id: str
     first_name: str
     last_name: str
     email: EmailStr
     password: str  # Hashed password
+    # Alias for user_id for compatibility; a plain attribute rather than a property
+    id: str = Field(default="", exclude=True, repr=False)
+    
+    @model_validator(mode='after')
+    def _set_id(self) -> "User":
+        self.id = self.user_id
+        return self
     
     @classmethod
     def from_dynamodb_item(cls, item: dict) -> "User":
@@ -36,14 +51,10 @@ class User(BaseModel):
             'email': self.email,
             'password': self.password
         }
-    
-    @property
-    def id(self) -> str:
-        """Alias for user_id for compatibility."""
-        return self.user_id
 
 class UserResponse(BaseModel):
     """User model without password for responses"""
+    __slots__ = ()
     id: str
     first_name: str
     last_name: str
@@ -56,3 +67,5 @@ class UserResponse(BaseModel):
 
 class UserCollection(BaseModel):
     users: list[UserResponse]
+    # Set on paginated listings when more users follow; pass back as ?cursor=
+    next_cursor: Optional[str] = None
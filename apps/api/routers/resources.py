@@ -1,68 +1,132 @@
-from fastapi import APIRouter, HTTPException, Body, status, Depends
+from fastapi import APIRouter, HTTPException, Body, status, Depends, Query
+from fastapi.responses import StreamingResponse
 from datetime import datetime
-from models.resource import ResourceModel, ResourceModelInput, ResourceCollection
-from models.user import User
+from models.resource import (
+    ResourceModel, ResourceModelInput, ResourceCollection, ResourceBatchCreated,
+    ArticleResource, CodeSnippetResource, BookResource, CourseResource
+)
+from models.tag import TagModel
+from models.user import User, UserResponse
 from utils.auth import get_current_user
+from utils.responses import PydanticResponse, PlainJSONResponse, ORJSON_OPTIONS
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from services import dynamodb
 import asyncio
+import orjson
 
 router = APIRouter(prefix="/resources", tags=["resources"])
 
+MAX_BATCH_SIZE = 100
+
+# resource type -> (response model, extractor for its type-specific fields)
+_RESOURCE_TYPES = {
+    "article": (ArticleResource, lambda item: {"url": item.get('url', '')}),
+    "code_snippet": (CodeSnippetResource, lambda item: {"code": item.get('code', '')}),
+    "book": (BookResource, lambda item: {"author": item.get('author')}),
+    "course": (CourseResource, lambda item: {"author": item.get('author')}),
+}
+
+# Input fields that only some resource types have
+_TYPE_SPECIFIC_FIELDS = ('url', 'code', 'author')
+
 @router.post("", response_model=ResourceModel, status_code=status.HTTP_201_CREATED)
 async def create_resource(
     resource: ResourceModelInput = Body(...),
     current_user: User = Depends(get_current_user)
 ):
-    resource_dict = resource.model_dump(exclude=["tag_ids"])
-    
     # Validate tags exist
-    if resource.tag_ids:
-        tag_items = await dynamodb.get_tags_by_ids(resource.tag_ids)
-        if len(tag_items) != len(resource.tag_ids):
-            found_ids = {tag['tag_id'] for tag in tag_items}
-            missing_ids = [tid for tid in resource.tag_ids if tid not in found_ids]
-            raise HTTPException(status_code=400, detail=f"Tags {missing_ids} do not exist")
+    tag_items = await _get_existing_tags(resource.tag_ids)
     
     # Create resource data
-    resource_data = {
-        'title': resource_dict['title'],
-        'description': resource_dict['description'],
-        'type': resource_dict['type'],
-        'user_id': current_user.user_id,
-        'tag_ids': resource.tag_ids,
-    }
-    
-    # Add optional fields based on type
-    if 'url' in resource_dict:
-        resource_data['url'] = resource_dict['url']
-    if 'code' in resource_dict:
-        resource_data['code'] = resource_dict['code']
-    if 'author' in resource_dict:
-        resource_data['author'] = resource_dict['author']
+    resource_data = _input_fields(resource)
+    resource_data['user_id'] = current_user.user_id
+    resource_data['tags'] = _embedded_tags(tag_items)
     
     resource_item = await dynamodb.create_resource(resource_data)
-    return await _resource_item_to_model(resource_item)
+    # The owner and tags are already in memory, so skip re-fetching them
+    return _build_resource_model(resource_item, _user_to_response(current_user), tag_items)
+
+@router.post(":batch", response_model=ResourceBatchCreated, status_code=status.HTTP_201_CREATED)
+async def create_resources_batch(
+    resources: list[ResourceModelInput] = Body(..., max_length=MAX_BATCH_SIZE),
+    current_user: User = Depends(get_current_user)
+):
+    """Create many resources at once: one tag lookup and batched writes for the whole list."""
+    for resource in resources:
+        if len(set(resource.tag_ids)) != len(resource.tag_ids):
+            raise HTTPException(status_code=400, detail="Duplicate tag_ids")
+    
+    # Validate every referenced tag in a single batched read
+    all_tag_ids = list(dict.fromkeys(tag_id for resource in resources for tag_id in resource.tag_ids))
+    tags_by_id = {tag['tag_id']: tag for tag in await _get_existing_tags(all_tag_ids)}
+    
+    resources_data = []
+    for resource in resources:
+        resource_data = _input_fields(resource)
+        resource_data['user_id'] = current_user.user_id
+        resource_data['tags'] = _embedded_tags([tags_by_id[tag_id] for tag_id in resource.tag_ids])
+        resources_data.append(resource_data)
+    
+    resource_items = await dynamodb.create_resources(resources_data)
+    return PydanticResponse(
+        ResourceBatchCreated(created_ids=[item['resource_id'] for item in resource_items]),
+        status_code=status.HTTP_201_CREATED
+    )
 
 @router.get("", response_model=ResourceCollection)
 async def list_resources(
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    _current_user: User = Depends(get_current_user)
+):
+    # Without limit or cursor, return every resource as before
+    next_cursor = None
+    if limit is None and cursor is None:
+        resource_items = await dynamodb.list_resources()
+    else:
+        resource_items, next_cursor = await dynamodb.list_resources_page(limit or DEFAULT_PAGE_SIZE, cursor)
+    processed_resources = await _resource_items_to_dicts(resource_items)
+    return PlainJSONResponse({'resources': processed_resources, 'next_cursor': next_cursor})
+
+@router.get(".ndjson", response_class=StreamingResponse)
+async def stream_resources(
     _current_user: User = Depends(get_current_user)
 ):
-    resource_items = await dynamodb.list_resources()
-    processed_resources = await asyncio.gather(*[_resource_item_to_model(item) for item in resource_items])
-    return ResourceCollection(resources=processed_resources)
+    """
+    Stream every resource as newline-delimited JSON, one ResourceModel per line.
+    The table is read a page at a time, so memory stays bounded by MAX_PAGE_SIZE
+    and the first lines go out before the whole scan finishes.
+    """
+    async def ndjson_lines():
+        cursor = None
+        while True:
+            resource_items, cursor = await dynamodb.list_resources_page(MAX_PAGE_SIZE, cursor)
+            # The 200 and earlier lines are already sent, so an HTTPException here
+            # would only cut the body short; orphaned resources are left out instead
+            for resource_row in await _resource_items_to_dicts(resource_items, skip_orphans=True):
+                yield orjson.dumps(resource_row, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+            if not cursor:
+                break
+    
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
 
 @router.get("/user/{user_id}", response_model=ResourceCollection)
 async def get_resources_by_user(
     user_id: str,
     _current_user: User = Depends(get_current_user)
 ):
-    user_item = await dynamodb.get_user_by_id(user_id)
+    # Independent reads: the owner (for the 404 check and the response) and their resources
+    user_item, resource_items = await asyncio.gather(
+        dynamodb.get_user_by_id(user_id),
+        dynamodb.get_resources_by_user_id(user_id),
+    )
     if not user_item:
         raise HTTPException(status_code=404, detail="User not found")
     
-    resource_items = await dynamodb.get_resources_by_user_id(user_id)
-    processed_resources = await asyncio.gather(*[_resource_item_to_model(item) for item in resource_items])
-    return ResourceCollection(resources=processed_resources)
+    processed_resources = await _resource_items_to_dicts(
+        resource_items, {user_id: _user_item_to_dict(user_item)}
+    )
+    return PlainJSONResponse({'resources': processed_resources, 'next_cursor': None})
 
 @router.put("/{resource_id}", response_model=ResourceModel)
 async def update_resource(
@@ -70,119 +134,185 @@ async def update_resource(
     resource: ResourceModelInput = Body(...),
     current_user: User = Depends(get_current_user)
 ):
-    existing_resource_item = await dynamodb.get_resource_by_id(resource_id)
-    if not existing_resource_item:
-        raise HTTPException(status_code=404, detail="Resource not found")
-    
-    # Check if user owns the resource
-    if existing_resource_item['user_id'] != current_user.user_id:
-        raise HTTPException(status_code=403, detail="You can only update your own resources")
-    
-    resource_dict = resource.model_dump(exclude=["tag_ids"])
-    
     # Validate tags exist
-    if resource.tag_ids:
-        tag_items = await dynamodb.get_tags_by_ids(resource.tag_ids)
-        if len(tag_items) != len(resource.tag_ids):
-            found_ids = {tag['tag_id'] for tag in tag_items}
-            missing_ids = [tid for tid in resource.tag_ids if tid not in found_ids]
-            raise HTTPException(status_code=400, detail=f"Tags {missing_ids} do not exist")
+    tag_items = await _get_existing_tags(resource.tag_ids)
     
     # Update resource fields
-    update_data = {
-        'title': resource_dict['title'],
-        'description': resource_dict['description'],
-        'type': resource_dict['type'],
-        'tag_ids': resource.tag_ids,
-    }
+    update_data = _input_fields(resource)
+    update_data['tags'] = _embedded_tags(tag_items)
     
-    # Add optional fields
-    if 'url' in resource_dict:
-        update_data['url'] = resource_dict['url']
-    if 'code' in resource_dict:
-        update_data['code'] = resource_dict['code']
-    if 'author' in resource_dict:
-        update_data['author'] = resource_dict['author']
+    # The ownership check is a condition on the update itself, so the happy path is one write
+    updated_resource_item = await dynamodb.update_resource(resource_id, update_data, owner_id=current_user.user_id)
+    if not updated_resource_item:
+        await _raise_not_found_or_forbidden(resource_id, "You can only update your own resources")
     
-    updated_resource_item = await dynamodb.update_resource(resource_id, update_data)
-    return await _resource_item_to_model(updated_resource_item)
+    # The conditional update proved the owner is current_user; tags were just validated
+    return _build_resource_model(updated_resource_item, _user_to_response(current_user), tag_items)
 
 @router.delete("/{resource_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_resource(
     resource_id: str,
     current_user: User = Depends(get_current_user)
 ):
-    existing_resource_item = await dynamodb.get_resource_by_id(resource_id)
-    if not existing_resource_item:
+    if not await dynamodb.delete_resource(resource_id, owner_id=current_user.user_id):
+        await _raise_not_found_or_forbidden(resource_id, "You can only delete your own resources")
+    return None
+
+async def _raise_not_found_or_forbidden(resource_id: str, forbidden_detail: str):
+    """After a failed owner-conditioned write, raise 404 if the resource is gone, else 403."""
+    # Only existence matters here, so don't download the item's body
+    if not await dynamodb.get_resource_by_id(resource_id, projection='resource_id'):
         raise HTTPException(status_code=404, detail="Resource not found")
+    raise HTTPException(status_code=403, detail=forbidden_detail)
+
+async def _get_existing_tags(tag_ids: list[str]) -> list[dict]:
+    """Fetch the requested tags in one batched call, or raise 400 naming any that don't exist."""
+    if not tag_ids:
+        return []
     
-    # Check if user owns the resource
-    if existing_resource_item['user_id'] != current_user.user_id:
-        raise HTTPException(status_code=403, detail="You can only delete your own resources")
+    requested_ids = set(tag_ids)
+    if len(requested_ids) != len(tag_ids):
+        raise HTTPException(status_code=400, detail="Duplicate tag_ids")
     
-    await dynamodb.delete_resource(resource_id)
-    return None
+    tag_items = await dynamodb.get_tags_by_ids(tag_ids)
+    if len(tag_items) != len(requested_ids):
+        missing_ids = requested_ids - {tag['tag_id'] for tag in tag_items}
+        raise HTTPException(status_code=400, detail=f"Tags {sorted(missing_ids)} do not exist")
+    return tag_items
 
-async def _resource_item_to_model(resource_item: dict) -> ResourceModel:
-    """Convert DynamoDB resource item to ResourceModel with denormalized user and tags."""
-    from models.resource import (
-        ArticleResource, CodeSnippetResource, BookResource, CourseResource
-    )
-    from models.user import UserResponse
-    from models.tag import TagModel
-    
-    # Fetch user
-    user_item = await dynamodb.get_user_by_id(resource_item['user_id'])
-    if not user_item:
-        raise HTTPException(status_code=404, detail="User not found for resource")
+async def _resource_items_to_dicts(
+    resource_items: list[dict],
+    known_users: dict[str, dict] | None = None,
+    skip_orphans: bool = False
+) -> list[dict]:
+    """
+    Convert a batch of resource items to ResourceModel-shaped dicts, fetching each
+    referenced user and tag only once.
+    Users already in known_users (keyed by user_id) are not fetched again.
+    A resource whose owner no longer exists raises a 404, or is left out when
+    skip_orphans is set.
+    """
+    users_by_id = dict(known_users or {})
+    user_ids = list({item['user_id'] for item in resource_items} - users_by_id.keys())
+    # Tags are embedded in each item; only legacy items without them need a lookup
+    tag_ids = list({
+        tag_id
+        for item in resource_items if 'tags' not in item
+        for tag_id in item.get('tag_ids') or []
+    })
     
-    user_response = UserResponse(
-        id=user_item['user_id'],
-        first_name=user_item['first_name'],
-        last_name=user_item['last_name'],
-        email=user_item['email']
+    # Resolve the whole batch's users and tags up front, one batched read each
+    user_items, tag_items = await asyncio.gather(
+        dynamodb.get_users_by_ids(user_ids),
+        dynamodb.get_tags_by_ids(tag_ids),
     )
+    users_by_id.update((user_item['user_id'], _user_item_to_dict(user_item)) for user_item in user_items)
+    tags_by_id = {tag['tag_id']: tag for tag in tag_items}
     
-    # Fetch tags
-    tag_items = []
-    if resource_item.get('tag_ids'):
-        tag_items = await dynamodb.get_tags_by_ids(resource_item['tag_ids'])
+    processed_resources = []
+    for item in resource_items:
+        user_dict = users_by_id.get(item['user_id'])
+        if not user_dict:
+            if skip_orphans:
+                continue
+            raise HTTPException(status_code=404, detail="User not found for resource")
+        
+        resource_tags = item.get('tags')
+        if resource_tags is None:
+            resource_tags = [tags_by_id[tag_id] for tag_id in item.get('tag_ids') or [] if tag_id in tags_by_id]
+        processed_resources.append(_resource_item_to_dict(item, user_dict, resource_tags))
+    return processed_resources
+
+def _input_fields(resource: ResourceModelInput) -> dict:
+    """The stored fields of a create/update body, read straight off the model instead of via model_dump."""
+    fields = {
+        'title': resource.title,
+        'description': resource.description,
+        'type': resource.type,
+        'tag_ids': resource.tag_ids,
+    }
     
+    # Add optional fields based on type
+    for name in _TYPE_SPECIFIC_FIELDS:
+        if name in type(resource).model_fields:
+            fields[name] = getattr(resource, name)
+    return fields
+
+def _embedded_tags(tag_items: list[dict]) -> list[dict]:
+    """Denormalized tag copies stored on each resource item so reads need no tag lookup."""
+    return [{'tag_id': tag['tag_id'], 'name': tag['name']} for tag in tag_items]
+
+# The builders below read data that was validated when it was written, so they
+# skip re-validation (EmailStr checks, coercion, etc.): single-resource responses
+# use model_construct, list responses plain dicts in the same shape
+
+def _user_item_to_dict(user_item: dict) -> dict:
+    """Convert a DynamoDB user item into a UserResponse-shaped dict."""
+    return {
+        'id': user_item['user_id'],
+        'first_name': user_item['first_name'],
+        'last_name': user_item['last_name'],
+        'email': user_item['email'],
+    }
+
+def _user_to_response(user: User) -> UserResponse:
+    """Convert an already-loaded User into the public UserResponse."""
+    return UserResponse.model_construct(
+        id=user.user_id,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        email=user.email
+    )
+
+def _build_resource_model(resource_item: dict, user_response: UserResponse, tag_items: list[dict]) -> ResourceModel:
+    """Assemble a ResourceModel from a resource item plus its already-fetched user and tags."""
     tags = [
-        TagModel(id=tag['tag_id'], name=tag['name'])
+        TagModel.model_construct(id=tag['tag_id'], name=tag['name'])
         for tag in tag_items
     ]
     
-    # Parse created_at - it should already be a datetime from deserialize_dynamodb_item
-    # but handle both cases for safety
-    created_at = resource_item.get('created_at')
-    if created_at and isinstance(created_at, str):
-        try:
-            # Handle ISO format strings
-            if created_at.endswith('Z'):
-                created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-            else:
-                created_at = datetime.fromisoformat(created_at)
-        except (ValueError, AttributeError, TypeError):
-            created_at = None
-    
     base_data = {
         "id": resource_item['resource_id'],
         "title": resource_item['title'],
         "description": resource_item['description'],
         "user": user_response,
         "tags": tags,
-        "created_at": created_at
+        "created_at": _parse_created_at(resource_item)
     }
     
+    resource_class, type_fields = _resource_type(resource_item)
+    return resource_class.model_construct(**base_data, **type_fields(resource_item))
+
+def _resource_item_to_dict(resource_item: dict, user_dict: dict, tag_items: list[dict]) -> dict:
+    """Like _build_resource_model, but returns the JSON-ready dict for PlainJSONResponse."""
+    _, type_fields = _resource_type(resource_item)
+    return {
+        "id": resource_item['resource_id'],
+        "title": resource_item['title'],
+        "description": resource_item['description'],
+        "user": user_dict,
+        "tags": [{"id": tag['tag_id'], "name": tag['name']} for tag in tag_items],
+        "created_at": _parse_created_at(resource_item),
+        "type": resource_item['type'],
+        **type_fields(resource_item),
+    }
+
+def _resource_type(resource_item: dict):
+    """Look up the (response model, type-specific field extractor) pair for an item."""
     resource_type = resource_item['type']
-    if resource_type == "article":
-        return ArticleResource(**base_data, url=resource_item.get('url', ''))
-    elif resource_type == "code_snippet":
-        return CodeSnippetResource(**base_data, code=resource_item.get('code', ''))
-    elif resource_type == "book":
-        return BookResource(**base_data, author=resource_item.get('author'))
-    elif resource_type == "course":
-        return CourseResource(**base_data, author=resource_item.get('author'))
-    else:
+    try:
+        return _RESOURCE_TYPES[resource_type]
+    except KeyError:
         raise ValueError(f"Unknown resource type: {resource_type}")
+
+def _parse_created_at(resource_item: dict) -> datetime | None:
+    """Read an item's created_at as a datetime, or None if it's missing or unparseable."""
+    # It should already be a datetime from deserialize_resource_item, but handle both cases for safety
+    created_at = resource_item.get('created_at')
+    if created_at and isinstance(created_at, str):
+        try:
+            # Python 3.11+ parses a trailing 'Z' natively
+            created_at = datetime.fromisoformat(created_at)
+        except ValueError:
+            created_at = None
+    return created_at
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Body, status, Depends
+from fastapi import APIRouter, Body, status, Depends, Query
+from fastapi.responses import StreamingResponse
 from models.tag import TagModel, Tag, TagCollection
 from models.user import User
 from utils.auth import get_current_user
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.responses import PlainJSONResponse
 from services import dynamodb
+import orjson
 
 router = APIRouter(prefix="/tags", tags=["tags"])
 
@@ -17,7 +21,32 @@ async def create_tag(
     return TagModel(id=tag_item['tag_id'], name=tag_item['name'])
 
 @router.get("", response_model=TagCollection)
-async def list_tags():
-    """List all tags (public endpoint)"""
-    tag_items = await dynamodb.list_tags()
-    return TagCollection(tags=[TagModel(id=item['tag_id'], name=item['name']) for item in tag_items])
+async def list_tags(
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None
+):
+    """List all tags (public endpoint), or one page of them when limit or cursor is given"""
+    next_cursor = None
+    if limit is None and cursor is None:
+        tag_items = await dynamodb.list_tags()
+    else:
+        tag_items, next_cursor = await dynamodb.list_tags_page(limit or DEFAULT_PAGE_SIZE, cursor)
+    tags = [{'id': item['tag_id'], 'name': item['name']} for item in tag_items]
+    return PlainJSONResponse({'tags': tags, 'next_cursor': next_cursor})
+
+@router.get(".ndjson", response_class=StreamingResponse)
+async def stream_tags():
+    """
+    Stream every tag as newline-delimited JSON, one TagModel per line (public endpoint).
+    The table is read a page at a time, so memory stays bounded by MAX_PAGE_SIZE.
+    """
+    async def ndjson_lines():
+        cursor = None
+        while True:
+            tag_items, cursor = await dynamodb.list_tags_page(MAX_PAGE_SIZE, cursor)
+            for item in tag_items:
+                yield orjson.dumps({'id': item['tag_id'], 'name': item['name']}, option=orjson.OPT_APPEND_NEWLINE)
+            if not cursor:
+                break
+    
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
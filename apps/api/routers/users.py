@@ -1,8 +1,13 @@
-from fastapi import APIRouter, HTTPException, Body, status, Depends
+from fastapi import APIRouter, HTTPException, Body, status, Depends, Query, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, EmailStr
-from models.user import UserModel, User, UserResponse, UserCollection
-from utils.auth import hash_password, verify_password, create_access_token, get_current_user
+from models.user import UserModel, UserUpdateModel, User, UserResponse, UserCollection
+from utils.auth import hash_password_async, verify_password_async, password_needs_rehash, create_access_token, get_current_user
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.responses import PlainJSONResponse
 from services import dynamodb
+import asyncio
+import orjson
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -15,17 +20,23 @@ class LoginResponse(BaseModel):
 	token: str
 
 @router.post("/login", response_model=LoginResponse)
-async def login(credentials: LoginRequest = Body(...)):
-	# Find user by email using DynamoDB GSI
+async def login(background_tasks: BackgroundTasks, credentials: LoginRequest = Body(...)):
+	# Find user by email via the user-emails table
 	user_item = await dynamodb.get_user_by_email(credentials.email)
-	if not user_item:
+	
+	# Verify password; an unknown email still pays for a (dummy) check so it
+	# can't be told apart from a wrong password by response time
+	stored_hash = user_item['password'] if user_item else None
+	if not await verify_password_async(credentials.password, stored_hash):
 		raise HTTPException(status_code=401, detail="Invalid email or password")
 	
 	user = User.from_dynamodb_item(user_item)
 	
-	# Verify password
-	if not verify_password(credentials.password, user.password):
-		raise HTTPException(status_code=401, detail="Invalid email or password")
+	# Upgrade hashes made with an older, cheaper BCRYPT_ROUNDS. Under uvicorn this runs
+	# after the response is sent; under Mangum the invocation only returns once
+	# background tasks finish, so on Lambda this one login pays for the extra hash.
+	if password_needs_rehash(user.password):
+		background_tasks.add_task(_upgrade_password_hash, user.user_id, user.password, credentials.password)
 	
 	# Generate JWT token
 	token = create_access_token(user.user_id)
@@ -42,25 +53,27 @@ async def login(credentials: LoginRequest = Body(...)):
 		token=token
 	)
 
+async def _upgrade_password_hash(user_id: str, old_hash: str, password: str):
+	# Conditional on the old hash, so a password changed meanwhile isn't overwritten
+	await dynamodb.replace_password_hash(user_id, old_hash, await hash_password_async(password))
+
 class SignupResponse(BaseModel):
 	user: UserResponse
 	token: str
 
 @router.post("", response_model=SignupResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(user: UserModel = Body(...)):
-    # Check if email already exists using DynamoDB GSI
-    existing_user_item = await dynamodb.get_user_by_email(user.email)
-    if existing_user_item:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
     # Create new user with hashed password
     user_data = {
         'first_name': user.first_name,
         'last_name': user.last_name,
         'email': user.email,
-        'password': hash_password(user.password)
+        'password': await hash_password_async(user.password)
     }
+    # The write itself enforces email uniqueness (see dynamodb.create_user)
     user_item = await dynamodb.create_user(user_data)
+    if not user_item:
+        raise HTTPException(status_code=400, detail="Email already registered")
     new_user = User.from_dynamodb_item(user_item)
     
     # Generate JWT token for the new user
@@ -78,25 +91,50 @@ async def create_user(user: UserModel = Body(...)):
     )
 
 @router.get("", response_model=UserCollection)
-async def list_users(current_user: User = Depends(get_current_user)):
-    """List all users (requires authentication)"""
-    user_items = await dynamodb.list_users()
-    # Convert to UserResponse to exclude passwords
-    user_responses = [
-        UserResponse(
-            id=item['user_id'],
-            first_name=item['first_name'],
-            last_name=item['last_name'],
-            email=item['email']
-        )
-        for item in user_items
-    ]
-    return UserCollection(users=user_responses)
+async def list_users(
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    current_user: User = Depends(get_current_user)
+):
+    """List all users (requires authentication), or one page of them when limit or cursor is given"""
+    next_cursor = None
+    if limit is None and cursor is None:
+        user_items = await dynamodb.list_users()
+    else:
+        user_items, next_cursor = await dynamodb.list_users_page(limit or DEFAULT_PAGE_SIZE, cursor)
+    users = [_user_item_to_dict(item) for item in user_items]
+    return PlainJSONResponse({'users': users, 'next_cursor': next_cursor})
+
+@router.get(".ndjson", response_class=StreamingResponse)
+async def stream_users(current_user: User = Depends(get_current_user)):
+    """
+    Stream every user as newline-delimited JSON, one UserResponse per line.
+    The table is read a page at a time, so memory stays bounded by MAX_PAGE_SIZE.
+    """
+    async def ndjson_lines():
+        cursor = None
+        while True:
+            user_items, cursor = await dynamodb.list_users_page(MAX_PAGE_SIZE, cursor)
+            for item in user_items:
+                yield orjson.dumps(_user_item_to_dict(item), option=orjson.OPT_APPEND_NEWLINE)
+            if not cursor:
+                break
+    
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+def _user_item_to_dict(user_item: dict) -> dict:
+    """A UserResponse-shaped dict for orjson; only the public fields, so passwords never leave."""
+    return {
+        'id': user_item['user_id'],
+        'first_name': user_item['first_name'],
+        'last_name': user_item['last_name'],
+        'email': user_item['email'],
+    }
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current authenticated user's information"""
-    return UserResponse(
+    return UserResponse.model_construct(
         id=current_user.user_id,
         first_name=current_user.first_name,
         last_name=current_user.last_name,
@@ -109,7 +147,8 @@ async def get_user(user_id: str):
     if not user_item:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return UserResponse(
+    # Stored items were validated on the way in, so skip re-validating them
+    return UserResponse.model_construct(
         id=user_item['user_id'],
         first_name=user_item['first_name'],
         last_name=user_item['last_name'],
@@ -119,30 +158,36 @@ async def get_user(user_id: str):
 @router.put("/{user_id}", response_model=UserResponse)
 async def update_user(
     user_id: str, 
-    user: UserModel = Body(...),
+    user: UserUpdateModel = Body(...),
     current_user: User = Depends(get_current_user)
 ):
     """Update user (requires authentication, can only update own profile)"""
-    existing_user_item = await dynamodb.get_user_by_id(user_id)
+    # A missing or empty password keeps the current one, so profile edits don't
+    # pay for a bcrypt hash; a new one is hashed on a worker thread while the user is read
+    if user.password:
+        existing_user_item, password_hash = await asyncio.gather(
+            dynamodb.get_user_by_id(user_id),
+            hash_password_async(user.password)
+        )
+    else:
+        existing_user_item, password_hash = await dynamodb.get_user_by_id(user_id), None
     if not existing_user_item:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Check if email is being changed to an existing email
-    if user.email != existing_user_item['email']:
-        email_exists = await dynamodb.get_user_by_email(user.email)
-        if email_exists:
-            raise HTTPException(status_code=400, detail="Email already registered")
-    
     # Update user fields
     update_data = {
         'first_name': user.first_name,
         'last_name': user.last_name,
         'email': user.email,
-        'password': hash_password(user.password)
     }
-    updated_user_item = await dynamodb.update_user(user_id, update_data)
+    if password_hash:
+        update_data['password'] = password_hash
+    # A changed email is claimed atomically with the update; None means it's taken
+    updated_user_item = await dynamodb.update_user(user_id, update_data, current_item=existing_user_item)
+    if not updated_user_item:
+        raise HTTPException(status_code=400, detail="Email already registered")
     
-    return UserResponse(
+    return UserResponse.model_construct(
         id=updated_user_item['user_id'],
         first_name=updated_user_item['first_name'],
         last_name=updated_user_item['last_name'],
@@ -159,5 +204,5 @@ async def delete_user(
     if not user_item:
         raise HTTPException(status_code=404, detail="User not found")
     
-    await dynamodb.delete_user(user_id)
+    await dynamodb.delete_user(user_id, email=user_item['email'])
     return None
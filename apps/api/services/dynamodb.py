@@ -1,13 +1,48 @@
+import asyncio
 import os
+import random
+import time
 import uuid
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from datetime import datetime, timezone
+from functools import cache
+from itertools import chain
+from typing import Optional, List, Dict, Any, Tuple, Callable
 import boto3
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+class DynamoDBError(Exception):
+    """
+    A DynamoDB operation failed. The message ("Error <operation>: <cause>") is
+    only formatted if something actually renders the error.
+    """
+    
+    def __init__(self, operation: str, cause: Any):
+        super().__init__(operation, cause)
+        self.operation = operation
+        self.cause = cause
+    
+    def __str__(self) -> str:
+        return f"Error {self.operation}: {self.cause}"
+
 # Detect environment
 IS_LAMBDA = os.getenv('AWS_LAMBDA_FUNCTION_NAME') is not None
 
+# Shared connection pool settings: the resource and client are cached for the
+# life of the process (i.e. across warm Lambda invocations), so size the pool
+# for concurrent requests and keep idle connections alive between them.
+# DynamoDB answers in milliseconds, so short timeouts let a stalled connection
+# fail over to a retry instead of holding the request for botocore's 60 s
+# default; adaptive retries also back off client-side when throttled.
+BOTO_CONFIG = Config(
+    max_pool_connections=int(os.getenv('DYNAMODB_MAX_POOL_CONNECTIONS', '50')),
+    tcp_keepalive=True,
+    connect_timeout=1,
+    read_timeout=3,
+    retries={'mode': 'adaptive', 'max_attempts': 3},
+)
+
 # Lazy initialization
 _dynamodb_resource = None
 _dynamodb_client = None
@@ -24,21 +59,23 @@ def get_dynamodb_resource():
             _dynamodb_resource = boto3.resource(
                 'dynamodb',
                 endpoint_url=endpoint_url,
-                region_name=region_name
-            ) if endpoint_url or region_name else boto3.resource('dynamodb')
+                region_name=region_name,
+                config=BOTO_CONFIG
+            ) if endpoint_url or region_name else boto3.resource('dynamodb', config=BOTO_CONFIG)
         else:
             # Local: Use AWS profile from environment variable (AWS Toolkit/SSO)
             profile = os.getenv('AWS_PROFILE')
             if profile:
                 session = boto3.Session(profile_name=profile, region_name=region_name)
-                _dynamodb_resource = session.resource('dynamodb', endpoint_url=endpoint_url) if endpoint_url else session.resource('dynamodb')
+                _dynamodb_resource = session.resource('dynamodb', endpoint_url=endpoint_url, config=BOTO_CONFIG) if endpoint_url else session.resource('dynamodb', config=BOTO_CONFIG)
             else:
                 # No profile specified - use default boto3 credential chain
                 _dynamodb_resource = boto3.resource(
                     'dynamodb',
                     endpoint_url=endpoint_url,
-                    region_name=region_name
-                ) if endpoint_url or region_name else boto3.resource('dynamodb')
+                    region_name=region_name,
+                    config=BOTO_CONFIG
+                ) if endpoint_url or region_name else boto3.resource('dynamodb', config=BOTO_CONFIG)
     
     return _dynamodb_resource
 
@@ -53,24 +90,49 @@ def get_dynamodb_client():
             _dynamodb_client = boto3.client(
                 'dynamodb',
                 endpoint_url=endpoint_url,
-                region_name=region_name
-            ) if endpoint_url or region_name else boto3.client('dynamodb')
+                region_name=region_name,
+                config=BOTO_CONFIG
+            ) if endpoint_url or region_name else boto3.client('dynamodb', config=BOTO_CONFIG)
         else:
             # Local: Use AWS profile from environment variable (AWS Toolkit/SSO)
             profile = os.getenv('AWS_PROFILE')
             if profile:
                 session = boto3.Session(profile_name=profile, region_name=region_name)
-                _dynamodb_client = session.client('dynamodb', endpoint_url=endpoint_url) if endpoint_url else session.client('dynamodb')
+                _dynamodb_client = session.client('dynamodb', endpoint_url=endpoint_url, config=BOTO_CONFIG) if endpoint_url else session.client('dynamodb', config=BOTO_CONFIG)
             else:
                 # No profile specified - use default boto3 credential chain
                 _dynamodb_client = boto3.client(
                     'dynamodb',
                     endpoint_url=endpoint_url,
-                    region_name=region_name
-                ) if endpoint_url or region_name else boto3.client('dynamodb')
+                    region_name=region_name,
+                    config=BOTO_CONFIG
+                ) if endpoint_url or region_name else boto3.client('dynamodb', config=BOTO_CONFIG)
     
     return _dynamodb_client
 
+# Optional DynamoDB Accelerator (DAX) cluster for single-item reads and writes
+DAX_ENDPOINT = os.getenv('DAX_ENDPOINT')
+_dax_resource = None
+
+def get_item_resource():
+    """
+    Resource for single-item and batch reads/writes: DAX when DAX_ENDPOINT is set,
+    else the plain DynamoDB resource.
+    Writes go through DAX too so its item cache stays current; scans and queries
+    stay on DynamoDB because DAX's query cache isn't invalidated by writes.
+    """
+    global _dax_resource
+    if not DAX_ENDPOINT:
+        return get_dynamodb_resource()
+    if _dax_resource is None:
+        # Optional dependency (amazon-dax-client), only needed when DAX is configured
+        from amazondax import AmazonDaxClient
+        _dax_resource = AmazonDaxClient.resource(
+            endpoint_url=DAX_ENDPOINT,
+            region_name=os.getenv('AWS_REGION') or os.getenv('AWS_DEFAULT_REGION')
+        )
+    return _dax_resource
+
 # Table names - use TABLE_PREFIX to construct table names
 TABLE_PREFIX = os.getenv('TABLE_PREFIX')
 if not TABLE_PREFIX:
@@ -80,65 +142,335 @@ if not TABLE_PREFIX:
 USERS_TABLE_NAME = f"{TABLE_PREFIX}-users"
 TAGS_TABLE_NAME = f"{TABLE_PREFIX}-tags"
 RESOURCES_TABLE_NAME = f"{TABLE_PREFIX}-resources"
-
-# Helper functions to get tables
+# One item per registered email ({email, user_id}); writing it with a condition
+# in the same transaction as the user makes email uniqueness atomic
+USER_EMAILS_TABLE_NAME = f"{TABLE_PREFIX}-user-emails"
+
+# The user attributes anyone besides the auth code needs; reads that only
+# render users fetch these and never download the password hash
+PUBLIC_USER_ATTRIBUTES = 'user_id, first_name, last_name, email'
+
+# Short-lived per-process cache of user items keyed by user_id, with an email
+# index, so the per-request auth lookup and repeat logins skip DynamoDB.
+# update_user/delete_user invalidate it; a change made through another
+# instance can take up to the TTL to be seen here. A TTL of 0 disables it.
+USER_CACHE_TTL_SECONDS = float(os.getenv('USER_CACHE_TTL_SECONDS', '60'))
+USER_CACHE_MAX_SIZE = 4096
+_user_cache: Dict[str, Tuple[Dict[str, Any], float]] = {}
+_user_id_by_email: Dict[str, str] = {}
+
+def _get_cached_user(user_id: str) -> Optional[Dict[str, Any]]:
+    entry = _user_cache.get(user_id)
+    if entry is None:
+        return None
+    user_item, expires_at = entry
+    if expires_at < time.monotonic():
+        _invalidate_cached_user(user_id)
+        return None
+    return user_item
+
+def _cache_user(user_item: Dict[str, Any]) -> None:
+    if USER_CACHE_TTL_SECONDS <= 0:
+        return
+    user_id = user_item['user_id']
+    _invalidate_cached_user(user_id)
+    if len(_user_cache) >= USER_CACHE_MAX_SIZE:
+        # Evict the oldest entry (dicts keep insertion order)
+        _invalidate_cached_user(next(iter(_user_cache)))
+    _user_cache[user_id] = (user_item, time.monotonic() + USER_CACHE_TTL_SECONDS)
+    _user_id_by_email[user_item['email']] = user_id
+
+def _invalidate_cached_user(user_id: str) -> None:
+    entry = _user_cache.pop(user_id, None)
+    if entry is not None and _user_id_by_email.get(entry[0]['email']) == user_id:
+        del _user_id_by_email[entry[0]['email']]
+
+# Per-process cache of tag items keyed by tag_id. The API can't rename or delete
+# tags, so an entry never goes stale and needs no TTL; resource writes validate
+# their tag_ids against it without a BatchGetItem once the tags are warm.
+TAG_CACHE_MAX_SIZE = 4096
+_tag_cache: Dict[str, Dict[str, Any]] = {}
+
+def _cache_tags(tag_items: List[Dict[str, Any]]) -> None:
+    for tag_item in tag_items:
+        if len(_tag_cache) >= TAG_CACHE_MAX_SIZE and tag_item['tag_id'] not in _tag_cache:
+            # Evict the oldest entry (dicts keep insertion order)
+            del _tag_cache[next(iter(_tag_cache))]
+        _tag_cache[tag_item['tag_id']] = tag_item
+
+# Helper functions to get tables. Table objects are built once per process and
+# reused, like the resource they come from.
+@cache
 def get_users_table():
     return get_dynamodb_resource().Table(USERS_TABLE_NAME)
 
+@cache
 def get_tags_table():
     return get_dynamodb_resource().Table(TAGS_TABLE_NAME)
 
+@cache
 def get_resources_table():
     return get_dynamodb_resource().Table(RESOURCES_TABLE_NAME)
 
+@cache
+def _item_table(table_name: str):
+    """Table for get/put/update/delete calls, routed through DAX when configured."""
+    return get_item_resource().Table(table_name)
+
+def warm_up() -> None:
+    """
+    Build the resource and Table objects and open pooled connections, so a cold
+    start resolves credentials and the endpoint and does the TLS handshake during
+    Lambda init instead of inside the first request.
+    """
+    try:
+        for table_name in (USERS_TABLE_NAME, USER_EMAILS_TABLE_NAME, TAGS_TABLE_NAME, RESOURCES_TABLE_NAME):
+            _item_table(table_name)
+        # Item operations and bulk reads use separate clients, each with its own pool
+        get_users_table().meta.client.describe_table(TableName=USERS_TABLE_NAME)
+        get_dynamodb_client().describe_table(TableName=RESOURCES_TABLE_NAME)
+    except Exception:
+        # Best effort: the first real call retries the connection and reports the error
+        pass
+
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_MAX_KEYS = 100
+# Backoff (seconds) before resubmitting UnprocessedKeys, which DynamoDB returns when throttling
+BATCH_RETRY_BASE_DELAY = 0.05
+BATCH_RETRY_MAX_DELAY = 2.0
+
+def _batch_get_chunk(table_name: str, key_name: str, ids: List[str], projection: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Fetch up to BATCH_GET_MAX_KEYS items with BatchGetItem, retrying unprocessed keys with backoff."""
+    request_items = {table_name: {'Keys': [{key_name: value} for value in ids]}}
+    if projection:
+        request_items[table_name]['ProjectionExpression'] = projection
+    items = []
+    attempt = 0
+    while True:
+        response = get_item_resource().batch_get_item(RequestItems=request_items)
+        items.extend(response['Responses'].get(table_name, []))
+        request_items = response.get('UnprocessedKeys')
+        if not request_items:
+            return items
+        # Exponential backoff with full jitter, as AWS recommends for batch retries
+        time.sleep(random.uniform(0, min(BATCH_RETRY_MAX_DELAY, BATCH_RETRY_BASE_DELAY * 2 ** attempt)))
+        attempt += 1
+
+
+async def _batch_get_items(table_name: str, key_name: str, ids: List[str], projection: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Fetch items by primary key, one BatchGetItem per 100 keys, with the chunks in flight concurrently."""
+    unique_ids = list(dict.fromkeys(ids))  # BatchGetItem rejects duplicate keys
+    chunks = await asyncio.gather(*(
+        asyncio.to_thread(_batch_get_chunk, table_name, key_name, unique_ids[start:start + BATCH_GET_MAX_KEYS], projection)
+        for start in range(0, len(unique_ids), BATCH_GET_MAX_KEYS)
+    ))
+    return list(chain.from_iterable(chunks))
+
+
+@cache
+def _set_expression(attribute_names: Tuple[str, ...]) -> Tuple[str, Dict[str, str]]:
+    """The UpdateExpression and name map for setting exactly these attributes, built once per combination."""
+    expression = "SET " + ", ".join(f"#{name} = :{name}" for name in attribute_names)
+    return expression, {f"#{name}": name for name in attribute_names}
+
+
+def _set_update(data: Dict[str, Any], key_name: str) -> Optional[Tuple[str, Dict[str, str], Dict[str, Any]]]:
+    """
+    Split data into (UpdateExpression, ExpressionAttributeNames, ExpressionAttributeValues)
+    for a SET of its non-None attributes, or None if there is nothing to set.
+    The name map is shared between calls; copy it before adding to it.
+    """
+    attribute_names, values = [], {}
+    for key, value in data.items():
+        if key == key_name or value is None:
+            continue
+        # Same conversion as serialize_dynamodb_item, done in this single pass
+        if type(value) not in _NATIVE_WRITE_TYPES:
+            value = _serialize_value(value)
+        attribute_names.append(key)
+        values[f":{key}"] = value
+    if not attribute_names:
+        return None
+    expression, names = _set_expression(tuple(attribute_names))
+    return expression, names, values
+
+
+def _transact_write(transact_items: List[Dict[str, Any]]) -> bool:
+    """Run TransactWriteItems; returns False if a condition failed, so nothing was written."""
+    return not _transact_write_failures(transact_items)
+
+
+def _transact_write_failures(transact_items: List[Dict[str, Any]]) -> List[int]:
+    """
+    Run TransactWriteItems; returns the indexes of the items whose condition
+    failed (empty when everything was written).
+    """
+    try:
+        get_item_resource().meta.client.transact_write_items(TransactItems=transact_items)
+        return []
+    except ClientError as e:
+        reasons = e.response.get('CancellationReasons') or []
+        failed = [index for index, reason in enumerate(reasons) if reason.get('Code') == 'ConditionalCheckFailed']
+        if failed:
+            return failed
+        raise
+
+
+def _release_email(email: str, user_id: str) -> Dict[str, Any]:
+    """Transaction step deleting a user's email entry (absent for users created before the table existed)."""
+    return {'Delete': {
+        'TableName': USER_EMAILS_TABLE_NAME,
+        'Key': {'email': email},
+        'ConditionExpression': 'attribute_not_exists(email) OR user_id = :user_id',
+        'ExpressionAttributeValues': {':user_id': user_id},
+    }}
+
+
+def _claim_email(email: str, user_id: str) -> Dict[str, Any]:
+    """Transaction step creating an email entry; fails if another user has the email."""
+    return {'Put': {
+        'TableName': USER_EMAILS_TABLE_NAME,
+        'Item': {'email': email, 'user_id': user_id},
+        'ConditionExpression': 'attribute_not_exists(email)',
+    }}
+
+
+def _batch_put_items(table, items: List[Dict[str, Any]]) -> None:
+    """Write items with BatchWriteItem instead of one PutItem each."""
+    # batch_writer groups puts into 25-item BatchWriteItem calls and
+    # resubmits any unprocessed items
+    with table.batch_writer() as batch:
+        for item in items:
+            batch.put_item(Item=item)
+
+
+# Bulk reads (scans and queries) use the low-level client and decode items with
+# _from_attribute_value: the resource layer's generic TypeDeserializer walk is
+# about twice as slow per item, which adds up over a full-table listing
+_TYPE_DESERIALIZER = TypeDeserializer()
+
+def _from_attribute_value(value: Dict[str, Any]) -> Any:
+    """Decode one DynamoDB AttributeValue, with the types this app stores handled inline."""
+    (type_code, raw), = value.items()
+    if type_code == 'S':
+        return raw
+    if type_code == 'L':
+        return [_from_attribute_value(element) for element in raw]
+    if type_code == 'M':
+        return {key: _from_attribute_value(element) for key, element in raw.items()}
+    # Numbers (as Decimal), booleans, nulls, binary and sets, exactly as boto3 decodes them
+    return _TYPE_DESERIALIZER.deserialize(value)
+
+
+def _read_all_pages(operation, **kwargs) -> List[Dict[str, Any]]:
+    """Run a low-level scan or query to completion, following LastEvaluatedKey past the 1 MB page limit."""
+    items = []
+    while True:
+        response = operation(**kwargs)
+        items.extend(
+            {key: _from_attribute_value(value) for key, value in item.items()}
+            for item in response['Items']
+        )
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return items
+        kwargs['ExclusiveStartKey'] = last_key
+
+
+# Full-table listings scan this many segments in parallel; each segment is
+# paged to completion on its own worker thread. 1 means a single sequential scan.
+SCAN_SEGMENTS = max(1, int(os.getenv('DYNAMODB_SCAN_SEGMENTS', '4')))
+
+async def _scan_all(table_name: str, **kwargs) -> List[Dict[str, Any]]:
+    """Scan a whole table as SCAN_SEGMENTS parallel segment scans; item order is unspecified."""
+    scan = get_dynamodb_client().scan
+    if SCAN_SEGMENTS == 1:
+        return await asyncio.to_thread(_read_all_pages, scan, TableName=table_name, **kwargs)
+    segments = await asyncio.gather(*(
+        asyncio.to_thread(
+            _read_all_pages, scan, TableName=table_name, Segment=segment, TotalSegments=SCAN_SEGMENTS, **kwargs
+        )
+        for segment in range(SCAN_SEGMENTS)
+    ))
+    return list(chain.from_iterable(segments))
+
+
+def _scan_page(table_name: str, key_name: str, limit: int, cursor: Optional[str], projection: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Scan up to limit items, starting after the item whose key_name is cursor.
+    Returns the decoded items and the cursor for the next page (None on the last page).
+    """
+    scan_kwargs = {'TableName': table_name, 'Limit': limit}
+    if cursor:
+        scan_kwargs['ExclusiveStartKey'] = {key_name: {'S': cursor}}
+    if projection:
+        scan_kwargs['ProjectionExpression'] = projection
+    
+    response = get_dynamodb_client().scan(**scan_kwargs)
+    items = [{key: _from_attribute_value(value) for key, value in item.items()} for item in response['Items']]
+    last_key = response.get('LastEvaluatedKey')
+    return items, last_key[key_name]['S'] if last_key else None
+
 
 # Helper functions for DynamoDB item conversion
+# Exact types boto3 stores as-is; checked by type() so the common case is one set lookup
+_NATIVE_WRITE_TYPES = frozenset({str, bool, int, float, list})
+
+
+def _serialize_value(value: Any) -> Any:
+    """Convert a value that isn't exactly one of the native types (subclasses included)."""
+    if isinstance(value, (str, bool, int, float, list)):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
 def serialize_dynamodb_item(item: Dict[str, Any]) -> Dict[str, Any]:
-    """Convert Python types to DynamoDB-compatible types."""
+    """Convert Python types to DynamoDB-compatible types, dropping None values."""
     result = {}
     for key, value in item.items():
         if value is None:
             continue
-        elif isinstance(value, str):
-            result[key] = value
-        elif isinstance(value, bool):
-            result[key] = value
-        elif isinstance(value, int):
-            result[key] = value
-        elif isinstance(value, float):
-            result[key] = value
-        elif isinstance(value, list):
-            result[key] = value
-        elif isinstance(value, datetime):
-            result[key] = value.isoformat()
-        else:
-            result[key] = str(value)
+        if type(value) not in _NATIVE_WRITE_TYPES:
+            value = _serialize_value(value)
+        result[key] = value
     return result
 
 
-def deserialize_dynamodb_item(item: Dict[str, Any]) -> Dict[str, Any]:
-    """Convert DynamoDB item to Python dict."""
-    result = {}
-    for key, value in item.items():
-        # Parse datetime fields (created_at, updated_at, etc.)
-        if isinstance(value, str) and (key.endswith('_at') or key == 'created_at'):
-            try:
-                # Handle ISO format strings with or without timezone
-                if value.endswith('Z'):
-                    result[key] = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                else:
-                    result[key] = datetime.fromisoformat(value)
-            except (ValueError, AttributeError, TypeError):
-                # If parsing fails, keep as string
-                result[key] = value
-        else:
-            result[key] = value
-    return result
+def _parse_iso_datetime(value: Any, _fromisoformat=datetime.fromisoformat) -> Any:
+    """Parse a stored ISO timestamp, keeping the raw value if it doesn't parse."""
+    try:
+        # Python 3.11+ parses a trailing 'Z' natively
+        return _fromisoformat(value)
+    except (ValueError, TypeError):
+        return value
+
+
+# (attribute, converter) pairs for the attributes each table stores in a form
+# other than the one callers expect. User and tag items hold only strings and
+# lists, so they are returned exactly as boto3 decodes them.
+RESOURCE_READ_CONVERTERS: Tuple[Tuple[str, Callable[[Any], Any]], ...] = (
+    ('created_at', _parse_iso_datetime),
+)
+
+
+def deserialize_resource_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a resource item in place; boto3 builds a fresh dict per response item."""
+    for key, convert in RESOURCE_READ_CONVERTERS:
+        value = item.get(key)
+        if value is not None:
+            item[key] = convert(value)
+    return item
 
 
 # User operations
-async def create_user(user_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Create a new user in DynamoDB."""
+async def create_user(user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Create a new user in DynamoDB, claiming their email in the same transaction.
+    Returns None if the email is already registered.
+    """
     user_id = str(uuid.uuid4())
     item = {
         'user_id': user_id,
@@ -150,83 +482,256 @@ async def create_user(user_data: Dict[str, Any]) -> Dict[str, Any]:
     item = serialize_dynamodb_item(item)
     
     try:
-        get_users_table().put_item(Item=item)
-        return item
+        # Users from before the user-emails table have no entry to collide with
+        # until backfill_user_emails.py runs; drop this check along with email-index
+        if await asyncio.to_thread(_query_email_index, item['email']) is not None:
+            return None
+        created = await asyncio.to_thread(_transact_write, [
+            {'Put': {
+                'TableName': USERS_TABLE_NAME,
+                'Item': item,
+                'ConditionExpression': 'attribute_not_exists(user_id)',
+            }},
+            _claim_email(item['email'], user_id),
+        ])
+        return item if created else None
     except ClientError as e:
-        raise Exception(f"Error creating user: {str(e)}")
+        raise DynamoDBError("creating user", e) from e
 
 
 async def get_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
-    """Get a user by user_id."""
+    """Get a user by user_id, from the user cache when possible."""
+    user_item = _get_cached_user(user_id)
+    if user_item is not None:
+        return user_item
+    
     try:
-        response = get_users_table().get_item(Key={'user_id': user_id})
+        response = await asyncio.to_thread(_item_table(USERS_TABLE_NAME).get_item, Key={'user_id': user_id})
         if 'Item' in response:
-            return deserialize_dynamodb_item(response['Item'])
+            user_item = response['Item']
+            _cache_user(user_item)
+            return user_item
         return None
     except ClientError as e:
-        raise Exception(f"Error getting user: {str(e)}")
+        raise DynamoDBError("getting user", e) from e
+
+
+async def get_users_by_ids(user_ids: List[str]) -> List[Dict[str, Any]]:
+    """Get multiple users (public attributes only) by their IDs, in the order requested."""
+    if not user_ids:
+        return []
+    
+    try:
+        items = await _batch_get_items(USERS_TABLE_NAME, 'user_id', user_ids, PUBLIC_USER_ATTRIBUTES)
+        users_by_id = {item['user_id']: item for item in items}
+        return [users_by_id[user_id] for user_id in user_ids if user_id in users_by_id]
+    except ClientError as e:
+        raise DynamoDBError("getting users by IDs", e) from e
 
 
 async def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
-    """Get a user by email using GSI."""
+    """Get a user by email via the user-emails table, from the user cache when possible."""
+    cached_user_id = _user_id_by_email.get(email)
+    if cached_user_id is not None:
+        user_item = _get_cached_user(cached_user_id)
+        if user_item is not None:
+            return user_item
+    
     try:
-        response = get_users_table().query(
-            IndexName='email-index',
-            KeyConditionExpression='email = :email',
-            ExpressionAttributeValues={':email': email}
+        # Two key lookups (the second often a cache hit); unlike a GSI query these
+        # see a just-committed signup
+        response = await asyncio.to_thread(
+            _item_table(USER_EMAILS_TABLE_NAME).get_item,
+            Key={'email': email},
+            ProjectionExpression='user_id'
         )
-        if response['Items']:
-            return deserialize_dynamodb_item(response['Items'][0])
-        return None
+        if 'Item' not in response:
+            # Users created before the user-emails table have no entry until
+            # backfill_user_emails.py runs; find them through the old GSI
+            user_item = await asyncio.to_thread(_query_email_index, email)
+            if user_item is not None:
+                _cache_user(user_item)
+            return user_item
     except ClientError as e:
-        raise Exception(f"Error getting user by email: {str(e)}")
+        raise DynamoDBError("getting user by email", e) from e
+    return await get_user_by_id(response['Item']['user_id'])
 
 
-async def update_user(user_id: str, user_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Update a user in DynamoDB."""
-    update_expression_parts = []
-    expression_attribute_values = {}
-    expression_attribute_names = {}
-    
-    for key, value in user_data.items():
-        if key != 'user_id' and value is not None:
-            update_expression_parts.append(f"#{key} = :{key}")
-            expression_attribute_names[f"#{key}"] = key
-            expression_attribute_values[f":{key}"] = value
-    
-    if not update_expression_parts:
-        return await get_user_by_id(user_id)
-    
-    update_expression = "SET " + ", ".join(update_expression_parts)
-    
+# How many times update_user re-reads a user whose email changed under it before giving up
+USER_EMAIL_UPDATE_ATTEMPTS = 3
+
+def _update_user_item(
+    user_id: str,
+    update: Tuple[str, Dict[str, str], Dict[str, Any]],
+    condition: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """UpdateItem returning the whole stored item, or None if condition failed."""
+    update_expression, expression_attribute_names, expression_attribute_values = update
+    condition_kwargs = {'ConditionExpression': condition} if condition else {}
     try:
-        response = get_users_table().update_item(
+        response = _item_table(USERS_TABLE_NAME).update_item(
             Key={'user_id': user_id},
             UpdateExpression=update_expression,
             ExpressionAttributeNames=expression_attribute_names,
-            ExpressionAttributeValues=serialize_dynamodb_item(expression_attribute_values),
-            ReturnValues='ALL_NEW'
+            ExpressionAttributeValues=expression_attribute_values,
+            ReturnValues='ALL_NEW',
+            **condition_kwargs
         )
-        return deserialize_dynamodb_item(response['Attributes'])
     except ClientError as e:
-        raise Exception(f"Error updating user: {str(e)}")
+        if condition and e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return None
+        raise
+    finally:
+        # Invalidate once the write has landed (or been refused); doing it earlier
+        # lets a lookup racing the write re-cache the old item
+        _invalidate_cached_user(user_id)
+    return response['Attributes']
+
+
+def _query_email_index(email: str) -> Optional[Dict[str, Any]]:
+    """The user with this email according to the users table's email-index GSI, if any."""
+    response = get_users_table().query(
+        IndexName='email-index',
+        KeyConditionExpression='email = :email',
+        ExpressionAttributeValues={':email': email},
+        Limit=1
+    )
+    return response['Items'][0] if response['Items'] else None
+
+
+async def update_user(
+    user_id: str,
+    user_data: Dict[str, Any],
+    current_item: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Update a user in DynamoDB and return the stored item.
+    A changed email is claimed (and the stored one released) in the same
+    transaction, returning None if the new email is already registered.
+    Pass the user's current item when the caller already has it; it's only
+    used to guess whether the email changes, as it may be a stale cache entry.
+    """
+    update = _set_update(user_data, 'user_id')
+    if update is None:
+        return current_item if current_item is not None else await get_user_by_id(user_id)
+    
+    update_expression, expression_attribute_names, expression_attribute_values = update
+    
+    new_email = user_data.get('email')
+    try:
+        if new_email is None:
+            return await asyncio.to_thread(_update_user_item, user_id, update)
+        
+        # Every write is conditioned on the email the table holds, so the user-emails
+        # entries can't drift from it when another instance changes the email
+        current_email = current_item['email'] if current_item is not None else new_email
+        for _ in range(USER_EMAIL_UPDATE_ATTEMPTS):
+            expression_attribute_values[':current_email'] = current_email
+            if current_email == new_email:
+                updated_item = await asyncio.to_thread(_update_user_item, user_id, update, '#email = :current_email')
+                if updated_item is not None:
+                    return updated_item
+            
+            response = await asyncio.to_thread(
+                _item_table(USERS_TABLE_NAME).get_item,
+                Key={'user_id': user_id},
+                ConsistentRead=True
+            )
+            if 'Item' not in response:
+                raise DynamoDBError("updating user", f"user {user_id} no longer exists")
+            stored_item = response['Item']
+            current_email = expression_attribute_values[':current_email'] = stored_item['email']
+            if current_email == new_email:
+                continue
+            
+            # As in create_user: the new email may belong to a user with no user-emails entry yet
+            owner = await asyncio.to_thread(_query_email_index, new_email)
+            if owner is not None and owner['user_id'] != user_id:
+                return None
+            
+            failed = await asyncio.to_thread(_transact_write_failures, [
+                {'Update': {
+                    'TableName': USERS_TABLE_NAME,
+                    'Key': {'user_id': user_id},
+                    'UpdateExpression': update_expression,
+                    'ConditionExpression': '#email = :current_email',
+                    'ExpressionAttributeNames': expression_attribute_names,
+                    'ExpressionAttributeValues': expression_attribute_values,
+                }},
+                _release_email(current_email, user_id),
+                _claim_email(new_email, user_id),
+            ])
+            _invalidate_cached_user(user_id)
+            if not failed:
+                # Transactions can't return the new item, but it's the consistent read plus every changed value
+                return {**stored_item, **{key: value for key, value in user_data.items() if value is not None}}
+            if 0 in failed:
+                # The email changed since the read; read it again
+                continue
+            if 1 in failed:
+                raise DynamoDBError("updating user", f"email {current_email} is registered to another user")
+            return None
+    except ClientError as e:
+        raise DynamoDBError("updating user", e) from e
+    raise DynamoDBError("updating user", f"email of user {user_id} kept changing concurrently")
+
+
+async def replace_password_hash(user_id: str, old_hash: str, new_hash: str) -> bool:
+    """
+    Swap a user's password hash for a rehash of the same password.
+    Returns False, writing nothing, if the stored hash is no longer old_hash
+    (the password was changed meanwhile).
+    """
+    try:
+        await asyncio.to_thread(
+            _item_table(USERS_TABLE_NAME).update_item,
+            Key={'user_id': user_id},
+            UpdateExpression='SET #password = :new_hash',
+            ConditionExpression='#password = :old_hash',
+            ExpressionAttributeNames={'#password': 'password'},
+            ExpressionAttributeValues={':new_hash': new_hash, ':old_hash': old_hash}
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return False
+        raise DynamoDBError("updating user", e) from e
+    finally:
+        # Whether or not it matched, the cached hash is now known or suspected stale
+        _invalidate_cached_user(user_id)
+    return True
 
 
-async def delete_user(user_id: str) -> None:
-    """Delete a user from DynamoDB."""
+async def delete_user(user_id: str, email: Optional[str] = None) -> None:
+    """Delete a user from DynamoDB, releasing their email if it's given."""
     try:
-        get_users_table().delete_item(Key={'user_id': user_id})
+        if email is None:
+            await asyncio.to_thread(_item_table(USERS_TABLE_NAME).delete_item, Key={'user_id': user_id})
+        else:
+            deleted = await asyncio.to_thread(_transact_write, [
+                {'Delete': {'TableName': USERS_TABLE_NAME, 'Key': {'user_id': user_id}}},
+                _release_email(email, user_id),
+            ])
+            if not deleted:
+                raise DynamoDBError("deleting user", f"email {email} is registered to another user")
+        _invalidate_cached_user(user_id)
     except ClientError as e:
-        raise Exception(f"Error deleting user: {str(e)}")
+        raise DynamoDBError("deleting user", e) from e
 
 
 async def list_users() -> List[Dict[str, Any]]:
-    """List all users."""
+    """List all users (public attributes only)."""
     try:
-        response = get_users_table().scan()
-        return [deserialize_dynamodb_item(item) for item in response['Items']]
+        return await _scan_all(USERS_TABLE_NAME, ProjectionExpression=PUBLIC_USER_ATTRIBUTES)
     except ClientError as e:
-        raise Exception(f"Error listing users: {str(e)}")
+        raise DynamoDBError("listing users", e) from e
+
+
+async def list_users_page(limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """List up to limit users after the user_id in cursor; returns the (public) items and the next cursor."""
+    try:
+        return await asyncio.to_thread(_scan_page, USERS_TABLE_NAME, 'user_id', limit, cursor, PUBLIC_USER_ATTRIBUTES)
+    except ClientError as e:
+        raise DynamoDBError("listing users", e) from e
 
 
 # Tag operations
@@ -240,57 +745,63 @@ async def create_tag(tag_data: Dict[str, Any]) -> Dict[str, Any]:
     item = serialize_dynamodb_item(item)
     
     try:
-        get_tags_table().put_item(Item=item)
+        await asyncio.to_thread(_item_table(TAGS_TABLE_NAME).put_item, Item=item)
+        _cache_tags([item])
         return item
     except ClientError as e:
-        raise Exception(f"Error creating tag: {str(e)}")
+        raise DynamoDBError("creating tag", e) from e
 
 
 async def get_tag_by_id(tag_id: str) -> Optional[Dict[str, Any]]:
-    """Get a tag by tag_id."""
+    """Get a tag by tag_id, from the tag cache when possible."""
+    tag_item = _tag_cache.get(tag_id)
+    if tag_item is not None:
+        return tag_item
+    
     try:
-        response = get_tags_table().get_item(Key={'tag_id': tag_id})
+        response = await asyncio.to_thread(_item_table(TAGS_TABLE_NAME).get_item, Key={'tag_id': tag_id})
         if 'Item' in response:
-            return deserialize_dynamodb_item(response['Item'])
+            _cache_tags([response['Item']])
+            return response['Item']
         return None
     except ClientError as e:
-        raise Exception(f"Error getting tag: {str(e)}")
+        raise DynamoDBError("getting tag", e) from e
 
 
 async def list_tags() -> List[Dict[str, Any]]:
     """List all tags."""
     try:
-        response = get_tags_table().scan()
-        return [deserialize_dynamodb_item(item) for item in response['Items']]
+        return await _scan_all(TAGS_TABLE_NAME)
     except ClientError as e:
-        raise Exception(f"Error listing tags: {str(e)}")
+        raise DynamoDBError("listing tags", e) from e
 
 
-async def get_tags_by_ids(tag_ids: List[str]) -> List[Dict[str, Any]]:
-    """Get multiple tags by their IDs."""
-    if not tag_ids:
-        return []
-    
+async def list_tags_page(limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """List up to limit tags after the tag_id in cursor; returns the items and the next cursor."""
     try:
-        # Use individual get_item calls for simplicity
-        # For small batches, this is fine. For larger batches, consider using
-        # the low-level client with proper DynamoDB format conversion
-        table = get_tags_table()
-        items = []
-        
-        for tag_id in tag_ids:
-            response = table.get_item(Key={'tag_id': tag_id})
-            if 'Item' in response:
-                items.append(response['Item'])
-        
-        return [deserialize_dynamodb_item(item) for item in items]
+        items, next_cursor = await asyncio.to_thread(_scan_page, TAGS_TABLE_NAME, 'tag_id', limit, cursor)
+        return items, next_cursor
     except ClientError as e:
-        raise Exception(f"Error getting tags by IDs: {str(e)}")
+        raise DynamoDBError("listing tags", e) from e
+
+
+async def get_tags_by_ids(tag_ids: List[str]) -> List[Dict[str, Any]]:
+    """Get multiple tags by their IDs, in the order requested; only tags missing from the tag cache are read."""
+    tags_by_id = {tag_id: _tag_cache[tag_id] for tag_id in tag_ids if tag_id in _tag_cache}
+    missing_ids = [tag_id for tag_id in tag_ids if tag_id not in tags_by_id]
+    if missing_ids:
+        try:
+            items = await _batch_get_items(TAGS_TABLE_NAME, 'tag_id', missing_ids)
+        except ClientError as e:
+            raise DynamoDBError("getting tags by IDs", e) from e
+        _cache_tags(items)
+        tags_by_id.update((item['tag_id'], item) for item in items)
+    return [tags_by_id[tag_id] for tag_id in tag_ids if tag_id in tags_by_id]
 
 
 # Resource operations
-async def create_resource(resource_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Create a new resource in DynamoDB."""
+def _build_resource_item(resource_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a new serialized resource item with a fresh resource_id."""
     resource_id = str(uuid.uuid4())
     item = {
         'resource_id': resource_id,
@@ -299,7 +810,8 @@ async def create_resource(resource_data: Dict[str, Any]) -> Dict[str, Any]:
         'type': resource_data['type'],
         'user_id': resource_data['user_id'],
         'tag_ids': resource_data.get('tag_ids', []),
-        'created_at': datetime.utcnow().isoformat(),
+        'tags': resource_data.get('tags', []),
+        'created_at': datetime.now(timezone.utc).isoformat(),
     }
     
     # Add optional fields based on type
@@ -310,85 +822,157 @@ async def create_resource(resource_data: Dict[str, Any]) -> Dict[str, Any]:
     if 'author' in resource_data:
         item['author'] = resource_data['author']
     
-    item = serialize_dynamodb_item(item)
+    return serialize_dynamodb_item(item)
+
+
+async def create_resource(resource_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a new resource in DynamoDB."""
+    item = _build_resource_item(resource_data)
     
     try:
-        get_resources_table().put_item(Item=item)
+        await asyncio.to_thread(_item_table(RESOURCES_TABLE_NAME).put_item, Item=item)
         return item
     except ClientError as e:
-        raise Exception(f"Error creating resource: {str(e)}")
+        raise DynamoDBError("creating resource", e) from e
 
 
-async def get_resource_by_id(resource_id: str) -> Optional[Dict[str, Any]]:
-    """Get a resource by resource_id."""
+async def create_resources(resources_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Create many resources with BatchWriteItem instead of one PutItem each."""
+    items = [_build_resource_item(resource_data) for resource_data in resources_data]
+    
     try:
-        response = get_resources_table().get_item(Key={'resource_id': resource_id})
-        if 'Item' in response:
-            return deserialize_dynamodb_item(response['Item'])
-        return None
+        await asyncio.to_thread(_batch_put_items, _item_table(RESOURCES_TABLE_NAME), items)
+        return items
     except ClientError as e:
-        raise Exception(f"Error getting resource: {str(e)}")
+        raise DynamoDBError("creating resources", e) from e
 
 
-async def update_resource(resource_id: str, resource_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Update a resource in DynamoDB."""
-    update_expression_parts = []
-    expression_attribute_values = {}
-    expression_attribute_names = {}
-    
-    for key, value in resource_data.items():
-        if key != 'resource_id' and value is not None:
-            update_expression_parts.append(f"#{key} = :{key}")
-            expression_attribute_names[f"#{key}"] = key
-            if isinstance(value, list):
-                expression_attribute_values[f":{key}"] = value
-            else:
-                expression_attribute_values[f":{key}"] = value
-    
-    if not update_expression_parts:
+async def get_resource_by_id(resource_id: str, projection: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Get a resource by resource_id; pass a projection to read only those attributes."""
+    get_kwargs = {'ProjectionExpression': projection} if projection else {}
+    try:
+        response = await asyncio.to_thread(
+            _item_table(RESOURCES_TABLE_NAME).get_item, Key={'resource_id': resource_id}, **get_kwargs
+        )
+        if 'Item' in response:
+            return deserialize_resource_item(response['Item'])
+        return None
+    except ClientError as e:
+        raise DynamoDBError("getting resource", e) from e
+
+
+async def update_resource(
+    resource_id: str,
+    resource_data: Dict[str, Any],
+    owner_id: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Update a resource in DynamoDB.
+    If owner_id is given, only update a resource owned by that user, in the same
+    request; returns None if the resource doesn't exist or belongs to someone else.
+    """
+    update = _set_update(resource_data, 'resource_id')
+    if update is None:
         return await get_resource_by_id(resource_id)
+    update_expression, expression_attribute_names, expression_attribute_values = update
     
-    update_expression = "SET " + ", ".join(update_expression_parts)
+    condition_kwargs = {}
+    if owner_id is not None:
+        condition_kwargs['ConditionExpression'] = '#owner_id = :owner_id'
+        expression_attribute_names = {**expression_attribute_names, '#owner_id': 'user_id'}
+        expression_attribute_values[':owner_id'] = owner_id
     
     try:
-        response = get_resources_table().update_item(
+        response = await asyncio.to_thread(
+            _item_table(RESOURCES_TABLE_NAME).update_item,
             Key={'resource_id': resource_id},
             UpdateExpression=update_expression,
             ExpressionAttributeNames=expression_attribute_names,
-            ExpressionAttributeValues=serialize_dynamodb_item(expression_attribute_values),
-            ReturnValues='ALL_NEW'
+            ExpressionAttributeValues=expression_attribute_values,
+            ReturnValues='ALL_NEW',
+            **condition_kwargs
         )
-        return deserialize_dynamodb_item(response['Attributes'])
+        return deserialize_resource_item(response['Attributes'])
     except ClientError as e:
-        raise Exception(f"Error updating resource: {str(e)}")
-
-
-async def delete_resource(resource_id: str) -> None:
-    """Delete a resource from DynamoDB."""
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return None
+        raise DynamoDBError("updating resource", e) from e
+
+
+async def delete_resource(resource_id: str, owner_id: Optional[str] = None) -> bool:
+    """
+    Delete a resource from DynamoDB.
+    If owner_id is given, only delete a resource owned by that user; returns
+    False if the resource doesn't exist or belongs to someone else.
+    """
+    condition_kwargs = {}
+    if owner_id is not None:
+        condition_kwargs = {
+            'ConditionExpression': 'user_id = :owner_id',
+            'ExpressionAttributeValues': {':owner_id': owner_id},
+        }
+    
     try:
-        get_resources_table().delete_item(Key={'resource_id': resource_id})
+        await asyncio.to_thread(
+            _item_table(RESOURCES_TABLE_NAME).delete_item, Key={'resource_id': resource_id}, **condition_kwargs
+        )
+        return True
     except ClientError as e:
-        raise Exception(f"Error deleting resource: {str(e)}")
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return False
+        raise DynamoDBError("deleting resource", e) from e
 
 
 async def list_resources() -> List[Dict[str, Any]]:
     """List all resources."""
     try:
-        response = get_resources_table().scan()
-        return [deserialize_dynamodb_item(item) for item in response['Items']]
+        items = await _scan_all(RESOURCES_TABLE_NAME)
+        return [deserialize_resource_item(item) for item in items]
     except ClientError as e:
-        raise Exception(f"Error listing resources: {str(e)}")
+        raise DynamoDBError("listing resources", e) from e
 
 
-async def get_resources_by_user_id(user_id: str) -> List[Dict[str, Any]]:
-    """Get all resources for a specific user using GSI."""
+async def list_resources_page(limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    List up to limit resources, starting after the resource_id in cursor.
+    Returns the items and the cursor for the next page (None on the last page).
+    """
     try:
-        response = get_resources_table().query(
-            IndexName='user_id-index',
-            KeyConditionExpression='user_id = :user_id',
-            ExpressionAttributeValues={':user_id': user_id}
+        items, next_cursor = await asyncio.to_thread(_scan_page, RESOURCES_TABLE_NAME, 'resource_id', limit, cursor)
+        return [deserialize_resource_item(item) for item in items], next_cursor
+    except ClientError as e:
+        raise DynamoDBError("listing resources", e) from e
+
+
+def _query_resources_by_user_id(user_id: str) -> List[Dict[str, Any]]:
+    """A user's raw resource items, newest first."""
+    query_kwargs = dict(
+        TableName=RESOURCES_TABLE_NAME,
+        KeyConditionExpression='user_id = :user_id',
+        ExpressionAttributeValues={':user_id': {'S': user_id}},
+    )
+    try:
+        return _read_all_pages(
+            get_dynamodb_client().query, IndexName='user_id-created_at-index', ScanIndexForward=False, **query_kwargs
         )
-        return [deserialize_dynamodb_item(item) for item in response['Items']]
     except ClientError as e:
-        raise Exception(f"Error getting resources by user_id: {str(e)}")
+        # DynamoDB reports an unusable index as a ValidationException (some
+        # emulators as ResourceNotFoundException)
+        if e.response['Error']['Code'] not in ('ValidationException', 'ResourceNotFoundException'):
+            raise
+    # The index can't be queried while DynamoDB is still backfilling it after the
+    # deploy that adds it (or on tables made before it existed); use the old
+    # user_id-index and sort here until it's ACTIVE
+    items = _read_all_pages(get_dynamodb_client().query, IndexName='user_id-index', **query_kwargs)
+    items.sort(key=lambda item: item.get('created_at', ''), reverse=True)
+    return items
+
+
+async def get_resources_by_user_id(user_id: str) -> List[Dict[str, Any]]:
+    """Get all resources for a specific user, newest first, using GSI."""
+    try:
+        items = await asyncio.to_thread(_query_resources_by_user_id, user_id)
+        return [deserialize_resource_item(item) for item in items]
+    except ClientError as e:
+        raise DynamoDBError("getting resources by user_id", e) from e
 
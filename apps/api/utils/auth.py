@@ -1,16 +1,36 @@
+import asyncio
 import hashlib
 import bcrypt
 import jwt
 import os
-from datetime import datetime, timedelta
+import secrets
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from models.user import User
+from services import dynamodb
 
 # JWT secret key - in production, use environment variable
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
+# Encoded once; PyJWT would otherwise re-encode the str key on every sign/verify
+_JWT_KEY = JWT_SECRET_KEY.encode('utf-8')
+# Disable iat (issued at) verification to avoid clock skew issues
+# The exp (expiration) claim is what matters for security
+# iat is mainly for auditing/logging and isn't critical for token validation
+_JWT_DECODE_OPTIONS = {
+    "verify_signature": True,
+    "verify_exp": True,
+    "verify_iat": False  # Disable iat verification to avoid clock skew issues
+}
+# Header segment (plus its separator) of every token create_access_token issues,
+# taken from PyJWT's own output so it follows the library's formatting
+_JWT_HEADER_PREFIX = jwt.encode({}, _JWT_KEY, algorithm=JWT_ALGORITHM).split('.', 1)[0] + '.'
+
+# bcrypt work factor for new hashes; each +1 doubles the cost (run
+# bcrypt_benchmark.py to pick a value for the deployment's CPU)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
@@ -20,7 +40,7 @@ def hash_password(password: str) -> str:
     # First hash with SHA256 to handle any length password
     sha256_hash = hashlib.sha256(password.encode('utf-8')).hexdigest()
     # Then hash with bcrypt for security
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     return bcrypt.hashpw(sha256_hash.encode('utf-8'), salt).decode('utf-8')
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -29,16 +49,46 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     sha256_hash = hashlib.sha256(plain_password.encode('utf-8')).hexdigest()
     return bcrypt.checkpw(sha256_hash.encode('utf-8'), hashed_password.encode('utf-8'))
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if a stored hash was made with fewer rounds than BCRYPT_ROUNDS."""
+    # bcrypt hashes look like $2b$<rounds>$<salt+digest>
+    return int(hashed_password.split('$')[2]) < BCRYPT_ROUNDS
+
+# bcrypt releases the GIL while hashing, so a worker thread keeps the event loop
+# free for other requests during the ~100+ ms a hash or check takes
+
+async def hash_password_async(password: str) -> str:
+    """hash_password, run on a worker thread."""
+    return await asyncio.to_thread(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str | None) -> bool:
+    """
+    verify_password, run on a worker thread.
+    Pass None when no user matched: the password is then checked against a dummy
+    hash and rejected, taking as long as a real check so timing doesn't reveal
+    which emails are registered.
+    """
+    if hashed_password is None:
+        return await asyncio.to_thread(_verify_against_dummy_hash, plain_password)
+    return await asyncio.to_thread(verify_password, plain_password, hashed_password)
+
+# Built at import (during Lambda init on a cold start): building it on first use
+# would make a process's first unknown-email login take a hash longer than the rest
+_DUMMY_PASSWORD_HASH = hash_password(secrets.token_hex(16))
+
+def _verify_against_dummy_hash(plain_password: str) -> bool:
+    verify_password(plain_password, _DUMMY_PASSWORD_HASH)
+    return False
+
 def create_access_token(user_id: str) -> str:
     """Create a JWT access token for a user."""
-    now = datetime.utcnow()
-    expiration = now + timedelta(hours=JWT_EXPIRATION_HOURS)
+    now = int(time.time())
     payload = {
         "sub": user_id,  # subject (user ID)
-        "exp": int(expiration.timestamp()),  # expiration time as Unix timestamp
-        "iat": int(now.timestamp())  # issued at as Unix timestamp (for auditing, not verified)
+        "exp": now + JWT_EXPIRATION_HOURS * 3600,  # expiration time as Unix timestamp
+        "iat": now  # issued at as Unix timestamp (for auditing, not verified)
     }
-    token = jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+    token = jwt.encode(payload, _JWT_KEY, algorithm=JWT_ALGORITHM)
     # Ensure token is a string (PyJWT 2.0+ returns string, older versions return bytes)
     if isinstance(token, bytes):
         return token.decode('utf-8')
@@ -52,20 +102,12 @@ def verify_token(token: str) -> dict:
     # Trim whitespace from token
     token = token.strip()
     
+    # Cheap rejection of malformed or foreign tokens before PyJWT parses anything
+    if not token.startswith(_JWT_HEADER_PREFIX) or token.count('.') != 2:
+        raise ValueError("Invalid token: unexpected format or header")
+    
     try:
-        # Disable iat (issued at) verification to avoid clock skew issues
-        # The exp (expiration) claim is what matters for security
-        # iat is mainly for auditing/logging and isn't critical for token validation
-        payload = jwt.decode(
-            token, 
-            JWT_SECRET_KEY, 
-            algorithms=[JWT_ALGORITHM],
-            options={
-                "verify_signature": True, 
-                "verify_exp": True, 
-                "verify_iat": False  # Disable iat verification to avoid clock skew issues
-            }
-        )
+        payload = jwt.decode(token, _JWT_KEY, algorithms=[JWT_ALGORITHM], options=_JWT_DECODE_OPTIONS)
         return payload
     except jwt.ExpiredSignatureError:
         raise ValueError("Token has expired")
@@ -86,8 +128,6 @@ async def get_current_user(
         async def protected_route(current_user: User = Depends(get_current_user)):
             return {"user_id": str(current_user.id)}
     """
-    from services import dynamodb
-    
     token = credentials.credentials
     try:
         payload = verify_token(token)
@@ -98,6 +138,7 @@ async def get_current_user(
                 detail="Invalid token payload: missing user ID"
             )
         
+        # Served from the service layer's short-lived user cache when warm
         user_item = await dynamodb.get_user_by_id(user_id)
         if not user_item:
             raise HTTPException(
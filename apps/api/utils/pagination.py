@@ -0,0 +1,3 @@
+# Bounds for the limit query parameter on paginated list endpoints
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
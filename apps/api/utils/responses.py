@@ -0,0 +1,30 @@
+from typing import Any
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+import orjson
+
+# Render datetimes the way pydantic does (UTC as 'Z') so both response classes agree
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+class PydanticResponse(JSONResponse):
+    """
+    JSON response that renders a pydantic model with model_dump_json.
+    
+    Returning this from a route bypasses FastAPI's response_model pass, so the
+    model is serialized exactly once, in pydantic-core. Keep response_model on
+    the decorator for the OpenAPI schema.
+    """
+    
+    def render(self, content: BaseModel) -> bytes:
+        return content.model_dump_json().encode('utf-8')
+
+class PlainJSONResponse(JSONResponse):
+    """
+    JSON response for content already assembled as plain dicts and lists.
+    
+    orjson walks the whole tree in C, so list endpoints that build their rows
+    straight from stored items never construct or serialize pydantic models.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)